@@ -0,0 +1,85 @@
+import os
+import tempfile
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from grid import (
+    Square,
+    grid_cell_bounds,
+    plot_grid_geojson_to_file,
+    plot_grid_to_file,
+    write_grid_geojson,
+)
+
+# Grid sizes (vertical squares, horizontal squares) to benchmark.
+# 3x6 is the grid used for AI guesses.
+GRID_SIZES = [(3, 6), (25, 40), (200, 250)]
+
+# Each renderer is run this many times, and the fastest run is reported
+REPEATS = 3
+
+
+def squares_from_bounds(bounds: np.ndarray) -> List[Square]:
+    """Create `Square` instances for the legacy per-square renderer."""
+    return [
+        Square(
+            id=id,
+            left=left,
+            right=right,
+            top=top,
+            bottom=bottom,
+            center=((top + bottom) / 2, (left + right) / 2),
+        )
+        for id, (left, right, top, bottom) in enumerate(bounds.tolist())
+    ]
+
+
+def measure(render: Callable[[str], None], path: str) -> Tuple[float, int]:
+    """Run `render` `REPEATS` times and return the fastest time it took
+    in seconds and the size of the file it created in bytes.
+    """
+    times = []
+    for _ in range(REPEATS):
+        since = time.perf_counter()
+        render(path)
+        times.append(time.perf_counter() - since)
+    return min(times), os.path.getsize(path)
+
+
+def run_benchmark() -> None:
+    """Compare generation time and file size of the grid renderers
+    for grids of increasing size.
+    """
+    print(f"{'cells':>7} {'renderer':<22} {'time [s]':>9} {'size [KiB]':>11}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for num_vertical, num_horizontal in GRID_SIZES:
+            bounds = grid_cell_bounds(num_vertical, num_horizontal)
+            values = np.random.rand(len(bounds))
+            squares = squares_from_bounds(bounds)
+
+            renderers = {
+                "folium markers (html)": lambda path: plot_grid_to_file(path, squares),
+                "geojson layer (html)": lambda path: plot_grid_geojson_to_file(
+                    path, bounds=bounds
+                ),
+                "geojson heatmap (html)": lambda path: plot_grid_geojson_to_file(
+                    path, values=values, bounds=bounds
+                ),
+                "geojson": lambda path: write_grid_geojson(path, bounds=bounds),
+                "geojson heatmap": lambda path: write_grid_geojson(
+                    path, values=values, bounds=bounds
+                ),
+            }
+
+            for name, render in renderers.items():
+                elapsed, size = measure(render, os.path.join(directory, "grid"))
+                print(
+                    f"{len(bounds):>7} {name:<22} {elapsed:>9.3f} {size / 1024:>11.1f}"
+                )
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
+import json
 import random
-from typing import List, Optional, Tuple
+from typing import List, Optional, Sequence, Tuple
 import numpy as np
 import folium
 
@@ -98,13 +99,184 @@ def get_square_for_coords(lat: float, long: float) -> Optional[Square]:
     return matching_squares[0]
 
 
-def plot_grid_to_file() -> None:
+def grid_cell_bounds(
+    num_vertical: int = NUM_VERTICAL_SQUARES,
+    num_horizontal: int = NUM_HORIZONTAL_SQUARES,
+) -> np.ndarray:
+    """Return an array of shape `(num_vertical * num_horizontal, 4)` holding
+    the `(left, right, top, bottom)` coordinates of every square, ordered
+    by square id. The bounds are computed for all squares at once, so this
+    also works for grids much finer than the one used for AI guesses.
+
+    >>> bounds = grid_cell_bounds()
+    >>> for square in SQUARES:
+    ...     assert tuple(bounds[square.id]) == (
+    ...         square.left, square.right, square.top, square.bottom
+    ...     )
+    """
+    vertical_points = np.linspace(TOP, BOTTOM, num=num_vertical + 1)
+    horizontal_points = np.linspace(LEFT, RIGHT, num=num_horizontal + 1)
+
+    ids = np.arange(num_vertical * num_horizontal)
+    columns = ids % num_horizontal
+    rows = ids // num_horizontal
+
+    return np.stack(
+        [
+            horizontal_points[columns],
+            horizontal_points[columns + 1],
+            vertical_points[rows],
+            vertical_points[rows + 1],
+        ],
+        axis=1,
+    )
+
+
+# Heatmap colors go from light yellow (lowest value) to dark red (highest value).
+# Precomputing the palette lets us color all squares with a single indexing
+# operation instead of formatting a color string for each square.
+_HEATMAP_LOW = np.array([255, 255, 178])
+_HEATMAP_HIGH = np.array([189, 0, 38])
+_HEATMAP_PALETTE_COLORS = np.rint(
+    _HEATMAP_LOW + np.linspace(0, 1, 256)[:, None] * (_HEATMAP_HIGH - _HEATMAP_LOW)
+).astype(int)
+_HEATMAP_PALETTE = np.array(
+    ["#%02x%02x%02x" % tuple(color) for color in _HEATMAP_PALETTE_COLORS]
+)
+# Used for squares which have no value, e.g. no validation images
+_HEATMAP_MISSING = "#808080"
+
+# Number of decimal places kept in GeoJSON coordinates, which is about 0.1m
+GEOJSON_COORDINATE_PRECISION = 6
+
+
+def heatmap_colors(values: Sequence[float]) -> np.ndarray:
+    """Map the values to heatmap colors, scaling them linearly between
+    the smallest and the largest value. Non-finite values (NaN or infinity)
+    are treated as missing and get a grey color.
+
+    >>> heatmap_colors([0.0, 0.5, 1.0, float("nan"), float("inf")]).tolist()
+    ['#ffffb2', '#de7f6c', '#bd0026', '#808080', '#808080']
+    """
+    values = np.asarray(values, dtype=float)
+    missing = ~np.isfinite(values)
+    if missing.all():
+        return np.full(values.shape, _HEATMAP_MISSING)
+
+    low = values[~missing].min()
+    value_range = values[~missing].max() - low
+    if value_range == 0:
+        value_range = 1.0
+
+    scaled = np.where(missing, 0, values - low) / value_range
+    colors = _HEATMAP_PALETTE[np.rint(scaled * 255).astype(int)]
+    colors[missing] = _HEATMAP_MISSING
+    return colors
+
+
+def grid_to_geojson(
+    values: Optional[Sequence[float]] = None,
+    bounds: Optional[np.ndarray] = None,
+) -> dict:
+    """Create a GeoJSON `FeatureCollection` with one polygon per square
+    of the grid. `bounds` is an array like the one returned by
+    `grid_cell_bounds`, defaulting to the grid used for AI guesses.
+
+    If `values` are given (e.g. per-square model probabilities or errors
+    from an evaluation run), `values[i]` is stored on the square with
+    ID `i` along with its heatmap color.
+
+    >>> geojson = grid_to_geojson(values=range(NUM_SQUARES))
+    >>> len(geojson["features"]) == NUM_SQUARES
+    True
+    >>> geojson["features"][0]["properties"]
+    {'id': 0, 'value': 0.0, 'color': '#ffffb2'}
+
+    The polygons' rings are counterclockwise, as required by RFC 7946,
+    which means their signed (shoelace) area is positive:
+
+    >>> for feature in geojson["features"]:
+    ...     ring = np.array(feature["geometry"]["coordinates"][0])
+    ...     x, y = ring[:-1].T
+    ...     assert np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y) > 0
+    """
+    if bounds is None:
+        bounds = grid_cell_bounds()
+
+    left, right, top, bottom = np.round(bounds, GEOJSON_COORDINATE_PRECISION).T
+    # GeoJSON uses (longitude, latitude) ordering, and polygon rings
+    # have to be counterclockwise and end with their first point.
+    rings = np.stack(
+        [
+            np.stack([left, top], axis=1),
+            np.stack([left, bottom], axis=1),
+            np.stack([right, bottom], axis=1),
+            np.stack([right, top], axis=1),
+            np.stack([left, top], axis=1),
+        ],
+        axis=1,
+    ).tolist()
+
+    if values is None:
+        properties = [{"id": id} for id in range(len(rings))]
+    else:
+        values = np.asarray(values, dtype=float)
+        if values.shape != (len(rings),):
+            raise ValueError(
+                f"Expected {len(rings)} values, one for each square, got {values.shape}"
+            )
+
+        # JSON has no NaN or infinity, so squares without a value get null instead
+        json_values = np.where(np.isfinite(values), values, None).tolist()
+        properties = [
+            {"id": id, "value": value, "color": color}
+            for id, (value, color) in enumerate(
+                zip(json_values, heatmap_colors(values).tolist())
+            )
+        ]
+
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "id": feature_properties["id"],
+                "geometry": {"type": "Polygon", "coordinates": [ring]},
+                "properties": feature_properties,
+            }
+            for ring, feature_properties in zip(rings, properties)
+        ],
+    }
+
+
+def dump_geojson(geojson: dict) -> str:
+    """Serialize GeoJSON without any unnecessary whitespace."""
+    return json.dumps(geojson, separators=(",", ":"))
+
+
+def write_grid_geojson(
+    path: str = "grid.geojson",
+    values: Optional[Sequence[float]] = None,
+    bounds: Optional[np.ndarray] = None,
+) -> None:
+    """Save the grid (and optionally a heatmap of `values`) as a compact GeoJSON
+    file on disk. See `grid_to_geojson` for the meaning of the parameters.
+    """
+    with open(path, "w") as file:
+        file.write(dump_geojson(grid_to_geojson(values=values, bounds=bounds)))
+
+
+def plot_grid_to_file(path: str = "grid.html", squares: List[Square] = SQUARES) -> None:
     """Visualize the AI guessing grid, creating an interactive HTML map and saving it
     to a file on disk.
+
+    Each square is drawn and labeled separately, which makes the file grow quickly
+    with the number of squares. For large grids or heatmaps, use
+    `plot_grid_geojson_to_file` instead.
     """
     square_map = folium.Map(prefer_canvas=True)
 
-    for square in SQUARES:
+    for square in squares:
         # Draw the square's boundaries
         folium.PolyLine(
             [
@@ -129,7 +301,59 @@ def plot_grid_to_file() -> None:
             ),
         ).add_to(square_map)
 
-    square_map.save("grid.html")
+    square_map.save(path)
+
+
+def plot_grid_geojson_to_file(
+    path: str = "grid_geojson.html",
+    values: Optional[Sequence[float]] = None,
+    bounds: Optional[np.ndarray] = None,
+) -> None:
+    """Visualize the grid as a single GeoJSON layer on an interactive HTML map
+    and save it to a file on disk. If `values` are given, the squares are
+    filled with a heatmap of them. Square IDs (and values) are shown
+    in a tooltip instead of a label for each square.
+    See `grid_to_geojson` for the meaning of the parameters.
+    """
+    if bounds is None:
+        bounds = grid_cell_bounds()
+
+    geojson = grid_to_geojson(values=values, bounds=bounds)
+    square_map = folium.Map(prefer_canvas=True)
+
+    def grid_style(_feature: dict) -> dict:
+        return {"color": "red", "weight": 2.5, "opacity": 1, "fillOpacity": 0}
+
+    def heatmap_style(feature: dict) -> dict:
+        return {
+            "color": "red",
+            "weight": 1,
+            "opacity": 1,
+            "fillColor": feature["properties"]["color"],
+            "fillOpacity": 0.6,
+        }
+
+    if values is None:
+        fields = ["id"]
+        style_function = grid_style
+    else:
+        fields = ["id", "value"]
+        style_function = heatmap_style
+
+    folium.GeoJson(
+        geojson,
+        style_function=style_function,
+        tooltip=folium.GeoJsonTooltip(fields=fields),
+    ).add_to(square_map)
+
+    left, right, top, bottom = bounds.T
+    square_map.fit_bounds(
+        [
+            (min(top.min(), bottom.min()), min(left.min(), right.min())),
+            (max(top.max(), bottom.max()), max(left.max(), right.max())),
+        ]
+    )
+    square_map.save(path)
 
 
 if __name__ == "__main__":
@@ -1,13 +1,18 @@
 import base64
+from dataclasses import dataclass
+from enum import Enum
+import hashlib
 from io import BytesIO
-from typing import List, Tuple
-from fastapi import FastAPI
+import os
+from typing import List, Optional, Sequence, Tuple
+from fastapi import FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
+from grid import dump_geojson, grid_to_geojson
 from guessing import distance, predict_location, score
 
-from model import GeoModel
+from model import GeoModel, load_square_evaluation
 from settings import SETTINGS
 
 app = FastAPI()
@@ -30,6 +35,16 @@ app.add_middleware(
 model = GeoModel()
 model.load_from_disk()
 
+# Per-square evaluation of the model used for heatmaps. It takes too long
+# to compute when starting the API, so it is saved to disk after training.
+# Heatmaps are unavailable when it hasn't been saved.
+SQUARE_EVALUATION_PATH = "models/resnet18v1.squares.npz"
+square_evaluation = (
+    load_square_evaluation(SQUARE_EVALUATION_PATH)
+    if os.path.exists(SQUARE_EVALUATION_PATH)
+    else None
+)
+
 
 class GetProblemResponse(BaseModel):
     image_base64: str
@@ -98,6 +113,100 @@ def post_guess(params: PostGuessParams) -> PostGuessResponse:
     )
 
 
+class GridHeatmap(str, Enum):
+    probability = "probability"
+    error = "error"
+
+
+@dataclass
+class GridGeoJson:
+    """A serialized GeoJSON grid layer together with its HTTP caching headers."""
+
+    content: str
+    etag: str
+    cache_control: str
+
+
+def create_grid_geojson(
+    values: Optional[Sequence[float]], cache_control: str
+) -> GridGeoJson:
+    content = dump_geojson(grid_to_geojson(values=values))
+    return GridGeoJson(
+        content=content,
+        etag=f'"{hashlib.sha256(content.encode()).hexdigest()}"',
+        cache_control=cache_control,
+    )
+
+
+# The grid layers never change while the API is running, so they are
+# only serialized once. The plain grid only changes with the code, so it
+# can be cached for a long time. The heatmaps change whenever the API is
+# restarted with retrained weights, so clients have to revalidate them
+# using their ETag.
+grid_geojsons = {
+    None: create_grid_geojson(values=None, cache_control="public, max-age=86400"),
+}
+if square_evaluation is not None:
+    square_probabilities, square_errors = square_evaluation
+    grid_geojsons[GridHeatmap.probability] = create_grid_geojson(
+        values=square_probabilities, cache_control="no-cache"
+    )
+    grid_geojsons[GridHeatmap.error] = create_grid_geojson(
+        values=square_errors, cache_control="no-cache"
+    )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check whether an `If-None-Match` header value matches the ETag,
+    using the weak comparison required for this header.
+
+    >>> etag_matches('W/"a", "b"', '"a"')
+    True
+    >>> etag_matches("*", '"a"')
+    True
+    >>> etag_matches('"b"', '"a"')
+    False
+    """
+    if if_none_match is None:
+        return False
+
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[len("W/") :]
+        if tag == "*" or tag == etag:
+            return True
+    return False
+
+
+@app.get("/grid")
+def get_grid(
+    heatmap: Optional[GridHeatmap] = None,
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    """Get the AI guessing grid as a GeoJSON layer with one polygon per square.
+
+    If `heatmap` is provided, every square also gets the model's mean
+    probability of the correct square or its mean guess error in kilometers
+    (measured on the validation dataset), along with a heatmap color.
+    Heatmaps are only available if the model's evaluation was saved to disk.
+    """
+    if heatmap not in grid_geojsons:
+        raise HTTPException(status_code=404, detail="Model evaluation not found")
+
+    grid_geojson = grid_geojsons[heatmap]
+    headers = {"Cache-Control": grid_geojson.cache_control, "ETag": grid_geojson.etag}
+
+    if etag_matches(if_none_match, grid_geojson.etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(
+        content=grid_geojson.content,
+        media_type="application/geo+json",
+        headers=headers,
+    )
+
+
 if __name__ == "__main__":
     # Start the API on the configured port
     uvicorn.run(
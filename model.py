@@ -8,9 +8,11 @@ from torchvision import datasets, models, transforms
 import time
 import copy
 
+import numpy as np
 from PIL import Image
 
 from grid import SQUARES
+from guessing import distance, predict_location
 
 
 class GeoModel:
@@ -166,6 +168,17 @@ class GeoModel:
         self.net.load_state_dict(torch.load(path))
         self.net.eval()
 
+    def _to_square_probabilities(self, net_probabilities: np.ndarray) -> List[float]:
+        """The probabilities are in the internal order of the network.
+        We need to assign them the correct class names.
+        """
+        probabilities = [None] * len(self.class_names)
+        for i in range(len(self.class_names)):
+            # Note that we assume that class names are just numbers of squares.
+            # If we wanted to use strings instead, we would have to use a dict.
+            probabilities[int(self.class_names[i])] = net_probabilities[i]
+        return probabilities
+
     def predict_random_image(
         self,
     ) -> Tuple[Image.Image, List[float], Tuple[float, float]]:
@@ -182,14 +195,7 @@ class GeoModel:
 
         # Just take the first image + probabilities of the batch
         net_probabilities = outputs.cpu().detach().numpy()[0]
-
-        # The probabilities are in the internal order of the network.
-        # We need to assign them the correct class names
-        probabilities = [None] * len(self.class_names)
-        for i in range(len(self.class_names)):
-            # Note that we assume that class names are just numbers of squares.
-            # If we wanted to use strings instead, we would have to use a dict.
-            probabilities[int(self.class_names[i])] = net_probabilities[i]
+        probabilities = self._to_square_probabilities(net_probabilities)
 
         return (
             transforms.ToPILImage()(inputs[0]).convert("RGB"),
@@ -197,6 +203,68 @@ class GeoModel:
             SQUARES[int(self.class_names[int(labels[0])])].center,
         )
 
+    def evaluate_squares(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Run inference on the whole validation dataset and return two arrays
+        indexed by square ID: the mean probability the model assigned to the
+        correct square, and the mean distance in kilometers between the model's
+        guess and the correct location, for images taken in that square.
+
+        Squares without any validation images get NaN. The results can be
+        visualized as heatmaps using the functions in `grid.py`.
+        """
+        probability_sums = np.zeros(len(SQUARES))
+        error_sums = np.zeros(len(SQUARES))
+        counts = np.zeros(len(SQUARES))
+
+        # The network's outputs are indexed by the training dataset's classes,
+        # while labels are indexed by the validation dataset's classes.
+        # These differ when some square is missing from one of the datasets.
+        val_class_names = self.image_datasets["val"].classes
+        net_indexes = {int(name): i for i, name in enumerate(self.class_names)}
+
+        with torch.no_grad():
+            for inputs, labels in self.dataloaders["val"]:
+                inputs = inputs.to(self.device)
+                outputs = nn.functional.softmax(self.net(inputs), dim=1)
+
+                for net_probabilities, label in zip(outputs.cpu().numpy(), labels):
+                    probabilities = self._to_square_probabilities(net_probabilities)
+                    square = SQUARES[int(val_class_names[int(label)])]
+
+                    # The network can't predict squares it wasn't trained on
+                    if square.id in net_indexes:
+                        probability_sums[square.id] += net_probabilities[
+                            net_indexes[square.id]
+                        ]
+                    error_sums[square.id] += distance(
+                        predict_location(probabilities), square.center
+                    )
+                    counts[square.id] += 1
+
+        mean_probabilities = np.full(len(SQUARES), np.nan)
+        mean_errors = np.full(len(SQUARES), np.nan)
+        np.divide(probability_sums, counts, out=mean_probabilities, where=counts > 0)
+        np.divide(error_sums, counts, out=mean_errors, where=counts > 0)
+        return mean_probabilities, mean_errors
+
+    def save_square_evaluation(self, path: str = "models/resnet18v1.squares.npz"):
+        """Runs `evaluate_squares` and saves its results to disk using
+        the specified `path`, so that they can be loaded without running
+        inference on the whole validation dataset again.
+        """
+        mean_probabilities, mean_errors = self.evaluate_squares()
+        np.savez(path, probabilities=mean_probabilities, errors=mean_errors)
+
+
+def load_square_evaluation(
+    path: str = "models/resnet18v1.squares.npz",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Loads the results of `GeoModel.evaluate_squares` saved by
+    `GeoModel.save_square_evaluation` from disk using the specified `path`.
+    """
+    with np.load(path) as evaluation:
+        return evaluation["probabilities"], evaluation["errors"]
+
 
 if __name__ == "__main__":
     # This main method will train the model and save it to disk.
@@ -214,6 +282,10 @@ if __name__ == "__main__":
     model = GeoModel()
     model.load_from_disk()
 
+    # Evaluate the model in each square of the validation dataset and save
+    # the results, which the API uses for its heatmaps
+    model.save_square_evaluation()
+
     # Run inference on a random image from the validation dataset
     image, probs = model.predict_random_image()
 